@@ -341,15 +341,29 @@ class TestCase(unittest.TestCase):
 
     def assertPytreeAlmostEqual(self, x, y, decimal=None):
         decimal = decimal or self.decimal
-        jax.tree_multimap(
-            lambda x, y: onp.testing.assert_array_almost_equal(
-                x, y, decimal=decimal), x, y)
+        leaves_x, treedef_x = jax.tree_flatten(x)
+        leaves_y, treedef_y = jax.tree_flatten(y)
+        self.assertEqual(treedef_x, treedef_y)
+
+        # fast path: a single reduction on device (one device-to-host transfer), using the same
+        # tolerance as numpy.testing.assert_array_almost_equal
+        if leaves_x and all(onp.shape(a) == onp.shape(b) for a, b in zip(leaves_x, leaves_y)):
+            diff = jnp.concatenate([jnp.ravel(a - b) for a, b in zip(leaves_x, leaves_y)])
+            if bool(jnp.all(jnp.abs(diff) < 1.5 * 10 ** (-decimal))):
+                return
+
+        # slow path: leaf-by-leaf comparison, which reports the offending leaf (this also handles
+        # broadcasting and matching nan's)
+        for i, (a, b) in enumerate(zip(leaves_x, leaves_y)):
+            onp.testing.assert_array_almost_equal(
+                a, b, decimal=decimal, err_msg=f"mismatch in leaf {i} of {treedef_x}")
 
     def assertPytreeNotEqual(self, x, y, margin=None):
         margin = margin or self.margin
         reldiff = jax.tree_multimap(
             lambda a, b: abs(2 * (a - b) / (a + b + 1e-16)), x, y)
-        maxdiff = max(jnp.max(d) for d in jax.tree_leaves(reldiff))
+        # single reduction (one device-to-host transfer), rather than one per leaf
+        maxdiff = jnp.max(jnp.concatenate([jnp.ravel(d) for d in jax.tree_leaves(reldiff)]))
         assert float(maxdiff) > margin
 
     def assertArraySubdtypeFloat(self, arr):
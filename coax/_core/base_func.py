@@ -20,7 +20,7 @@
 # ------------------------------------------------------------------------------------------------ #
 
 from abc import ABC, abstractmethod
-from copy import deepcopy
+from copy import copy, deepcopy
 from typing import Any, Tuple, NamedTuple
 
 import jax
@@ -135,17 +135,25 @@ class BaseFunc(ABC, RandomStateMixin):
 
         self.params = self._soft_update_func(self.params, other.params, tau)
 
-    def copy(self):
-        """ Create a deep copy.
+    def copy(self, deep=True):
+        """ Create a copy of the current instance.
+
+        Parameters
+        ----------
+        deep : bool, optional
+
+            Whether to create a deep copy. A shallow copy shares its :attr:`params` and
+            :attr:`function_state` with the original instance, which is cheaper and perfectly safe,
+            because these pytrees are never modified in-place, only replaced.
 
         Returns
         -------
         copy
 
-            A deep copy of the current instance.
+            A copy of the current instance.
 
         """
-        return deepcopy(self)
+        return deepcopy(self) if deep else copy(self)
 
     @property
     def params(self):
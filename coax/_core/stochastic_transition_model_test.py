@@ -39,7 +39,14 @@ boxspace = gym.spaces.Box(low=0, high=1, shape=(3, 5))
 Env = namedtuple('Env', ('observation_space', 'action_space'))
 
 
-def func_discrete_type1(S, A, is_training):
+def outer(S, A):
+    # batched outer product of the flattened inputs, i.e. a cheaper jax.vmap(jnp.kron)(S, A)
+    S = jnp.reshape(S, (S.shape[0], -1))
+    A = jnp.reshape(A, (A.shape[0], -1))
+    return jnp.einsum('bi,bj->bij', S, A)
+
+
+def trunk(X, is_training):
     batch_norm = hk.BatchNorm(False, False, 0.99)
     seq = hk.Sequential((
         hk.Flatten(),
@@ -47,74 +54,52 @@ def func_discrete_type1(S, A, is_training):
         partial(hk.dropout, hk.next_rng_key(), 0.25 if is_training else 0.),
         partial(batch_norm, is_training=is_training),
         hk.Linear(8), jnp.tanh,
-        hk.Linear(discrete.n),
     ))
-    X = jax.vmap(jnp.kron)(S, A)
-    return {'logits': seq(X)}
+    return seq(X)
 
 
-def func_discrete_type2(S, is_training):
-    batch_norm = hk.BatchNorm(False, False, 0.99)
+def head(X, shape):
     seq = hk.Sequential((
-        hk.Flatten(),
-        hk.Linear(8), jax.nn.relu,
-        partial(hk.dropout, hk.next_rng_key(), 0.25 if is_training else 0.),
-        partial(batch_norm, is_training=is_training),
-        hk.Linear(8), jnp.tanh,
-        hk.Linear(discrete.n * discrete.n),
-        hk.Reshape((discrete.n, discrete.n)),
+        hk.Linear(onp.prod(shape)),
+        hk.Reshape(shape),
     ))
-    return {'logits': seq(S)}
+    return seq(X)
+
+
+def func_discrete_type1(S, A, is_training):
+    X = trunk(outer(S, A), is_training)
+    return {'logits': head(X, (discrete.n,))}
+
+
+def func_discrete_type2(S, is_training):
+    X = trunk(S, is_training)
+    return {'logits': head(X, (discrete.n, discrete.n))}
 
 
 def func_boxspace_type1(S, A, is_training):
-    batch_norm = hk.BatchNorm(False, False, 0.99)
-    mu = hk.Sequential((
-        hk.Flatten(),
-        hk.Linear(8), jax.nn.relu,
-        partial(hk.dropout, hk.next_rng_key(), 0.25 if is_training else 0.),
-        partial(batch_norm, is_training=is_training),
-        hk.Linear(8), jnp.tanh,
-        hk.Linear(onp.prod(boxspace.shape)),
-        hk.Reshape(boxspace.shape),
-    ))
-    logvar = hk.Sequential((
-        hk.Flatten(),
-        hk.Linear(8), jax.nn.relu,
-        partial(hk.dropout, hk.next_rng_key(), 0.25 if is_training else 0.),
-        partial(batch_norm, is_training=is_training),
-        hk.Linear(8), jnp.tanh,
-        hk.Linear(onp.prod(boxspace.shape)),
-        hk.Reshape(boxspace.shape),
-    ))
-    X = jax.vmap(jnp.kron)(S, A)
-    return {'mu': mu(X), 'logvar': logvar(X)}
+    X = trunk(outer(S, A), is_training)
+    return {'mu': head(X, boxspace.shape), 'logvar': head(X, boxspace.shape)}
 
 
 def func_boxspace_type2(S, is_training):
-    batch_norm = hk.BatchNorm(False, False, 0.99)
-    mu = hk.Sequential((
-        hk.Flatten(),
-        hk.Linear(8), jax.nn.relu,
-        partial(hk.dropout, hk.next_rng_key(), 0.25 if is_training else 0.),
-        partial(batch_norm, is_training=is_training),
-        hk.Linear(8), jnp.tanh,
-        hk.Linear(onp.prod(boxspace.shape) * discrete.n),
-        hk.Reshape((discrete.n, *boxspace.shape)),
-    ))
-    logvar = hk.Sequential((
-        hk.Flatten(),
-        hk.Linear(8), jax.nn.relu,
-        partial(hk.dropout, hk.next_rng_key(), 0.25 if is_training else 0.),
-        partial(batch_norm, is_training=is_training),
-        hk.Linear(8), jnp.tanh,
-        hk.Linear(onp.prod(boxspace.shape) * discrete.n),
-        hk.Reshape((discrete.n, *boxspace.shape)),
-    ))
-    return {'mu': mu(S), 'logvar': logvar(S)}
+    X = trunk(S, is_training)
+    shape = (discrete.n, *boxspace.shape)
+    return {'mu': head(X, shape), 'logvar': head(X, shape)}
 
 
 class TestStochasticTransitionModel(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._models = {}
+
+    def get_model(self, func, env):
+        # the test_call_* and test_mode_* tests share models, so that each one is only built once
+        key = (func, id(env.observation_space), id(env.action_space))
+        if key not in self._models:
+            self._models[key] = StochasticTransitionModel(func, env, random_seed=19)
+        return self._models[key]
+
     def test_init(self):
         # cannot define a type-2 models on a non-discrete action space
         msg = r"type-2 models are only well-defined for Discrete action spaces"
@@ -163,7 +148,7 @@ class TestStochasticTransitionModel(TestCase):
 
         s = safe_sample(env.observation_space, seed=17)
         a = safe_sample(env.action_space, seed=18)
-        p = StochasticTransitionModel(func, env, random_seed=19)
+        p = self.get_model(func, env)
 
         s_next, logp = p(s, a, return_logp=True)
         print(s_next, logp, env.observation_space)
@@ -181,7 +166,7 @@ class TestStochasticTransitionModel(TestCase):
 
         s = safe_sample(env.observation_space, seed=17)
         a = safe_sample(env.action_space, seed=18)
-        p = StochasticTransitionModel(func, env, random_seed=19)
+        p = self.get_model(func, env)
 
         s_next, logp = p(s, a, return_logp=True)
         print(s_next, logp, env.observation_space)
@@ -199,7 +184,7 @@ class TestStochasticTransitionModel(TestCase):
 
         s = safe_sample(env.observation_space, seed=17)
         a = safe_sample(env.action_space, seed=18)
-        p = StochasticTransitionModel(func, env, random_seed=19)
+        p = self.get_model(func, env)
 
         s_next, logp = p(s, a, return_logp=True)
         print(s_next, logp, env.observation_space)
@@ -217,7 +202,7 @@ class TestStochasticTransitionModel(TestCase):
 
         s = safe_sample(env.observation_space, seed=17)
         a = safe_sample(env.action_space, seed=18)
-        p = StochasticTransitionModel(func, env, random_seed=19)
+        p = self.get_model(func, env)
 
         s_next, logp = p(s, a, return_logp=True)
         print(s_next, logp, env.observation_space)
@@ -235,7 +220,7 @@ class TestStochasticTransitionModel(TestCase):
 
         s = safe_sample(env.observation_space, seed=17)
         a = safe_sample(env.action_space, seed=18)
-        p = StochasticTransitionModel(func, env, random_seed=19)
+        p = self.get_model(func, env)
 
         s_next, logp = p(s, a, return_logp=True)
         print(s_next, logp, env.observation_space)
@@ -253,7 +238,7 @@ class TestStochasticTransitionModel(TestCase):
 
         s = safe_sample(env.observation_space, seed=17)
         a = safe_sample(env.action_space, seed=18)
-        p = StochasticTransitionModel(func, env, random_seed=19)
+        p = self.get_model(func, env)
 
         s_next, logp = p(s, a, return_logp=True)
         print(s_next, logp, env.observation_space)
@@ -273,7 +258,7 @@ class TestStochasticTransitionModel(TestCase):
 
         s = safe_sample(env.observation_space, seed=17)
         a = safe_sample(env.action_space, seed=18)
-        p = StochasticTransitionModel(func, env, random_seed=19)
+        p = self.get_model(func, env)
 
         s_next = p.mode(s, a)
         print(s_next, env.observation_space)
@@ -289,7 +274,7 @@ class TestStochasticTransitionModel(TestCase):
 
         s = safe_sample(env.observation_space, seed=17)
         a = safe_sample(env.action_space, seed=18)
-        p = StochasticTransitionModel(func, env, random_seed=19)
+        p = self.get_model(func, env)
 
         s_next = p.mode(s, a)
         print(s_next, env.observation_space)
@@ -305,7 +290,7 @@ class TestStochasticTransitionModel(TestCase):
 
         s = safe_sample(env.observation_space, seed=17)
         a = safe_sample(env.action_space, seed=18)
-        p = StochasticTransitionModel(func, env, random_seed=19)
+        p = self.get_model(func, env)
 
         s_next = p.mode(s, a)
         print(s_next, env.observation_space)
@@ -321,7 +306,7 @@ class TestStochasticTransitionModel(TestCase):
 
         s = safe_sample(env.observation_space, seed=17)
         a = safe_sample(env.action_space, seed=18)
-        p = StochasticTransitionModel(func, env, random_seed=19)
+        p = self.get_model(func, env)
 
         s_next = p.mode(s, a)
         print(s_next, env.observation_space)
@@ -337,7 +322,7 @@ class TestStochasticTransitionModel(TestCase):
 
         s = safe_sample(env.observation_space, seed=17)
         a = safe_sample(env.action_space, seed=18)
-        p = StochasticTransitionModel(func, env, random_seed=19)
+        p = self.get_model(func, env)
 
         s_next = p.mode(s, a)
         print(s_next, env.observation_space)
@@ -353,7 +338,7 @@ class TestStochasticTransitionModel(TestCase):
 
         s = safe_sample(env.observation_space, seed=17)
         a = safe_sample(env.action_space, seed=18)
-        p = StochasticTransitionModel(func, env, random_seed=19)
+        p = self.get_model(func, env)
 
         s_next = p.mode(s, a)
         print(s_next, env.observation_space)
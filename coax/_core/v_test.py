@@ -76,6 +76,14 @@ class TestV(TestCase):
         v_targ.soft_update(v, tau=tau)
         self.assertPytreeAlmostEqual(v_targ.params, expected)
 
+    def test_shallow_copy(self):
+        v = self.v
+        v_targ = v.copy(deep=False)
+        self.assertIs(v_targ.params, v.params)
+        v.params = jax.tree_map(jnp.ones_like, v.params)
+        self.assertIsNot(v_targ.params, v.params)
+        self.assertPytreeNotEqual(v_targ.params, v.params)
+
     def test_function_state(self):
         print(self.v.function_state)
         batch_norm_avg = self.v.function_state['batch_norm/~/mean_ema']['average']
@@ -19,9 +19,6 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.          #
 # ------------------------------------------------------------------------------------------------ #
 
-from collections import deque
-from random import sample
-
 import jax
 import numpy as onp
 
@@ -70,7 +67,9 @@ class SimpleReplayBuffer:
     """
     def __init__(self, capacity, random_seed=None):
         self.capacity = int(capacity)
-        self._rnd = onp.random.RandomState(random_seed)
+        self._rnd = onp.random.default_rng(random_seed)  # its choice() is O(batch_size)
+        self._storage = None  # list of leaves, allocated lazily upon first call to add()
+        self._treedef = None
         self.clear()
 
     def add(self, transition_batch):
@@ -84,7 +83,28 @@ class SimpleReplayBuffer:
             A :class:`TransitionBatch <coax.reward_tracing.TransitionBatch>` object.
 
         """
-        self._deque.extend(transition_batch.to_singles())
+        if not isinstance(transition_batch, TransitionBatch):
+            raise TypeError(
+                f"transition_batch must be a TransitionBatch, got: {type(transition_batch)}")
+
+        leaves, treedef = jax.tree_flatten(transition_batch)
+        if self._storage is None or (not self and treedef != self._treedef):
+            # preallocate one array of shape (capacity, ...) per leaf
+            self._treedef = treedef
+            self._storage = [
+                onp.empty((self.capacity,) + onp.shape(x)[1:], onp.asarray(x).dtype)
+                for x in leaves]
+        if treedef != self._treedef:
+            raise TypeError(
+                "transition_batch must have the same tree structure as the transitions that are "
+                "already stored in the buffer")
+
+        batch_size = min(transition_batch.batch_size, self.capacity)
+        idx = (self._index + onp.arange(batch_size)) % self.capacity
+        for storage, x in zip(self._storage, leaves):
+            storage[idx] = x[-batch_size:]
+        self._index = (self._index + batch_size) % self.capacity
+        self._len = min(self._len + batch_size, self.capacity)
 
     def sample(self, batch_size=32):
         r"""
@@ -103,30 +123,20 @@ class SimpleReplayBuffer:
             A :class:`TransitionBatch <coax.reward_tracing.TransitionBatch>` object.
 
         """
-        def concatenate_leaves(pytrees):
-            return jax.tree_multimap(lambda *leaves: onp.concatenate(leaves, axis=0), *pytrees)
-
-        transitions = sample(self._deque, batch_size)
-        return TransitionBatch(
-            S=concatenate_leaves(t.S for t in transitions),
-            A=concatenate_leaves(t.A for t in transitions),
-            logP=concatenate_leaves(t.logP for t in transitions),
-            Rn=concatenate_leaves(t.Rn for t in transitions),
-            In=concatenate_leaves(t.In for t in transitions),
-            S_next=concatenate_leaves(t.S_next for t in transitions),
-            A_next=concatenate_leaves(t.A_next for t in transitions),
-            logP_next=concatenate_leaves(t.logP_next for t in transitions),
-        )
+        idx = self._rnd.choice(len(self), batch_size, replace=False)
+        return jax.tree_unflatten(self._treedef, [storage[idx] for storage in self._storage])
 
     def clear(self):
         r"""
         Clear the experience replay buffer.
 
         """
-        self._deque = deque(maxlen=self.capacity)
+        # N.B. we keep the preallocated storage around, it's simply overwritten by subsequent adds
+        self._index = 0
+        self._len = 0
 
     def __len__(self):
-        return len(self._deque)
+        return self._len
 
     def __bool__(self):
         return bool(len(self))
@@ -0,0 +1,122 @@
+# ------------------------------------------------------------------------------------------------ #
+# MIT License                                                                                      #
+#                                                                                                  #
+# Copyright (c) 2020, Microsoft Corporation                                                        #
+#                                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software    #
+# and associated documentation files (the "Software"), to deal in the Software without             #
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,       #
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the    #
+# Software is furnished to do so, subject to the following conditions:                             #
+#                                                                                                  #
+# The above copyright notice and this permission notice shall be included in all copies or         #
+# substantial portions of the Software.                                                            #
+#                                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING    #
+# BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND       #
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,     #
+# DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,   #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.          #
+# ------------------------------------------------------------------------------------------------ #
+
+from time import perf_counter
+
+import numpy as onp
+
+from .._base.test_case import TestCase
+from ..reward_tracing import TransitionBatch
+from ._simple import SimpleReplayBuffer
+
+
+def get_transition_batch(start, stop):
+    # the returns Rn are used to identify the individual transitions
+    Rn = onp.arange(start, stop, dtype='float32')
+    n = len(Rn)
+    return TransitionBatch(
+        S={'x': onp.stack([onp.full((2, 3), r) for r in Rn])},
+        A=onp.arange(n) % 3,
+        logP=onp.zeros(n),
+        Rn=Rn,
+        In=onp.full(n, 0.9),
+        S_next={'x': onp.stack([onp.full((2, 3), r + 1) for r in Rn])})
+
+
+class TestSimpleReplayBuffer(TestCase):
+
+    def stored_returns(self, buffer):
+        return sorted(buffer.sample(batch_size=len(buffer)).Rn)
+
+    def test_add_and_sample(self):
+        buffer = SimpleReplayBuffer(capacity=7)
+        buffer.add(get_transition_batch(0, 5))
+        self.assertEqual(len(buffer), 5)
+
+        transition_batch = buffer.sample(batch_size=3)
+        self.assertIsInstance(transition_batch, TransitionBatch)
+        self.assertEqual(transition_batch.batch_size, 3)
+        self.assertArrayShape(transition_batch.S['x'], (3, 2, 3))
+        self.assertIsNone(transition_batch.A_next)
+        self.assertPytreeAlmostEqual(transition_batch.S['x'][:, 0, 0], transition_batch.Rn)
+        self.assertPytreeAlmostEqual(transition_batch.S_next['x'][:, 0, 0], transition_batch.Rn + 1)
+
+    def test_ring_wraparound(self):
+        buffer = SimpleReplayBuffer(capacity=5)
+        for t in range(7):
+            buffer.add(get_transition_batch(t, t + 1))
+        self.assertEqual(len(buffer), 5)
+        self.assertEqual(self.stored_returns(buffer), [2., 3., 4., 5., 6.])
+
+    def test_batch_larger_than_capacity(self):
+        buffer = SimpleReplayBuffer(capacity=5)
+        buffer.add(get_transition_batch(0, 8))
+        self.assertEqual(len(buffer), 5)
+        self.assertEqual(self.stored_returns(buffer), [3., 4., 5., 6., 7.])
+
+    def test_seeded_sampling(self):
+        buffer1 = SimpleReplayBuffer(capacity=20, random_seed=13)
+        buffer2 = SimpleReplayBuffer(capacity=20, random_seed=13)
+        buffer1.add(get_transition_batch(0, 20))
+        buffer2.add(get_transition_batch(0, 20))
+        self.assertPytreeAlmostEqual(buffer1.sample(8).Rn, buffer2.sample(8).Rn)
+
+    def test_sample_more_than_stored(self):
+        buffer = SimpleReplayBuffer(capacity=10)
+        buffer.add(get_transition_batch(0, 3))
+        with self.assertRaises(ValueError):
+            buffer.sample(batch_size=4)
+
+    def test_clear(self):
+        buffer = SimpleReplayBuffer(capacity=5)
+        buffer.add(get_transition_batch(0, 4))
+        storage = buffer._storage
+
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+        self.assertFalse(buffer)
+
+        buffer.add(get_transition_batch(10, 12))
+        self.assertIs(buffer._storage, storage)  # preallocated storage is reused
+        self.assertEqual(self.stored_returns(buffer), [10., 11.])
+
+    def test_bad_tree_structure(self):
+        buffer = SimpleReplayBuffer(capacity=5)
+        buffer.add(get_transition_batch(0, 2))
+        transition_batch = get_transition_batch(2, 3)
+        transition_batch.A_next = transition_batch.A
+        with self.assertRaises(TypeError):
+            buffer.add(transition_batch)
+
+    def test_sample_large_capacity(self):
+        # sampling should cost O(batch_size), not O(capacity)
+        n = 1000000
+        buffer = SimpleReplayBuffer(capacity=n, random_seed=13)
+        buffer.add(TransitionBatch(
+            S=onp.zeros((n, 1), dtype='float32'), A=onp.zeros(n, dtype='int32'),
+            logP=onp.zeros(n, dtype='float32'), Rn=onp.arange(n, dtype='float32'),
+            In=onp.zeros(n, dtype='float32'), S_next=onp.zeros((n, 1), dtype='float32')))
+
+        t_start = perf_counter()
+        for _ in range(100):
+            transition_batch = buffer.sample(batch_size=32)
+        self.assertLess(perf_counter() - t_start, 1.0)  # ~0.01s in practice
+        self.assertEqual(len(onp.unique(transition_batch.Rn)), 32)
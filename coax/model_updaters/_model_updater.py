@@ -24,7 +24,8 @@ import jax.numpy as jnp
 import haiku as hk
 import optax
 
-from ..utils import get_grads_diagnostics, is_stochastic, is_reward_function, is_transition_model
+from ..utils import (
+    get_grads_diagnostics, has_nans, is_stochastic, is_reward_function, is_transition_model)
 from ..value_losses import huber
 from ..regularizers import Regularizer
 
@@ -151,7 +152,7 @@ class ModelUpdater:
 
         """
         grads, function_state, metrics = self.grads_and_metrics(transition_batch)
-        if any(jnp.any(jnp.isnan(g)) for g in jax.tree_leaves(grads)):
+        if has_nans(grads):
             raise RuntimeError(f"found nan's in grads: {grads}")
         self.update_from_grads(grads, function_state)
         return metrics
@@ -27,7 +27,7 @@ import optax
 import haiku as hk
 
 from .._core.policy import Policy
-from ..utils import get_grads_diagnostics
+from ..utils import get_grads_diagnostics, has_nans
 from ..regularizers import Regularizer
 
 
@@ -163,7 +163,7 @@ class PolicyObjective:
 
         """
         grads, function_state, metrics = self.grads_and_metrics(transition_batch, Adv)
-        if any(jnp.any(jnp.isnan(g)) for g in jax.tree_leaves(grads)):
+        if has_nans(grads):
             raise RuntimeError(f"found nan's in grads: {grads}")
         self.update_from_grads(grads, function_state)
         return metrics
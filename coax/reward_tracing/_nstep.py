@@ -26,7 +26,7 @@ import numpy as onp
 
 from .._base.errors import InsufficientCacheError, EpisodeDoneError
 from ._base import BaseShortTermCache
-from ._transition import TransitionSingle
+from ._transition import TransitionBatch, _to_batch
 
 
 __all__ = (
@@ -52,29 +52,41 @@ class NStep(BaseShortTermCache):
     def __init__(self, n, gamma):
         self.n = int(n)
         self.gamma = float(gamma)
+        self._gammas = onp.cumprod([1.] + [self.gamma] * (self.n - 1), dtype=onp.float32)
+        self._gammas.flags.writeable = False
+        self._gamman = self._gammas[-1] * onp.float32(self.gamma)
         self.reset()
 
     def reset(self):
-        self._deque_sap = deque([])
+        self._deque_s = deque([])
+        self._deque_a = deque([])
+        self._deque_logp = deque([])
         self._deque_r = deque([])
         self._done = False
-        self._gammas = onp.power(self.gamma, onp.arange(self.n))
-        self._gamman = onp.power(self.gamma, self.n)
 
     def add(self, s, a, r, done, logp=0.0):
-        if self._done and len(self):
+        if self._is_done() and len(self):
             raise EpisodeDoneError(
                 "please flush cache (or repeatedly call popleft) before appending new transitions")
 
-        self._deque_sap.append((s, a, logp))
+        self._deque_s.append(s)
+        self._deque_a.append(a)
+        self._deque_logp.append(logp)
         self._deque_r.append(r)
-        self._done = bool(done)
+        # host-side flags are coerced right away, whereas device arrays (which are immutable) are
+        # only coerced once we actually need them, see _is_done()
+        on_host = isinstance(done, (int, float, onp.ndarray, onp.generic))
+        self._done = bool(done) if on_host else done
 
     def __len__(self):
-        return len(self._deque_sap)
+        return len(self._deque_s)
 
     def __bool__(self):
-        return bool(len(self)) and (self._done or len(self) > self.n)
+        return bool(len(self)) and (self._is_done() or len(self) > self.n)
+
+    def _is_done(self):
+        self._done = bool(self._done)  # blocks at most once per call to add()
+        return self._done
 
     def pop(self):
         if not self:
@@ -82,23 +94,30 @@ class NStep(BaseShortTermCache):
                 "cache needs to receive more transitions before it can be popped from")
 
         # pop state-action (propensities) pair
-        s, a, logp = self._deque_sap.popleft()
+        s = self._deque_s.popleft()
+        a = self._deque_a.popleft()
+        logp = self._deque_logp.popleft()
 
         # n-step partial return
-        zipped = zip(self._gammas, self._deque_r)
-        rn = sum(x * r for x, r in islice(zipped, self.n))
+        r_window = onp.asarray(list(islice(self._deque_r, self.n)), dtype=onp.float32)
+        rn = onp.tensordot(self._gammas[:len(r_window)], r_window, axes=1)
         self._deque_r.popleft()
 
+        # batch the popped transition
+        S = _to_batch(s)
+        A = _to_batch(a)
+        logP = _to_batch(logp)
+        Rn = onp.expand_dims(rn, axis=0)
+
         # keep in mind that we've already popped (s, a, logp)
         if len(self) >= self.n:
-            s_next, a_next, logp_next = self._deque_sap[self.n - 1]
-            done = False
+            S_next = _to_batch(self._deque_s[self.n - 1])
+            A_next = _to_batch(self._deque_a[self.n - 1])
+            logP_next = _to_batch(self._deque_logp[self.n - 1])
+            In = onp.array([self._gamman], dtype=onp.float32)
         else:
             # no more bootstrapping
-            s_next, a_next, logp_next, done = s, a, logp, True
-
-        transition = TransitionSingle(
-            s=s, a=a, logp=logp, r=rn, done=done,
-            s_next=s_next, a_next=a_next, logp_next=logp_next)
+            S_next, A_next, logP_next, In = S, A, logP, onp.zeros(1, dtype=onp.float32)
 
-        return transition.to_batch(gamma=self._gamman)
+        return TransitionBatch(
+            S=S, A=A, logP=logP, Rn=Rn, In=In, S_next=S_next, A_next=A_next, logP_next=logP_next)
@@ -123,23 +123,17 @@ class TransitionSingle(BaseTransition):
         self.a_next = a_next
         self.logp_next = logp_next
 
-    @staticmethod
-    def _to_batch(pytree):
-        if pytree is None:
-            return None
-        return jax.tree_map(lambda x: onp.expand_dims(x, axis=0), pytree)
-
     def to_batch(self, gamma=0.9):
         s, a, logp, r, done, info, s_next, a_next, logp_next = self
         return TransitionBatch(
-            S=self._to_batch(s),
-            A=self._to_batch(a),
-            logP=self._to_batch(logp),
-            Rn=self._to_batch(r),
-            In=self._to_batch(gamma * (1 - done)),
-            S_next=self._to_batch(s_next),
-            A_next=self._to_batch(a_next),
-            logP_next=self._to_batch(logp_next),
+            S=_to_batch(s),
+            A=_to_batch(a),
+            logP=_to_batch(logp),
+            Rn=_to_batch(r),
+            In=_to_batch(gamma * (1 - done)),
+            S_next=_to_batch(s_next),
+            A_next=_to_batch(a_next),
+            logP_next=_to_batch(logp_next),
         )
 
 
@@ -251,3 +245,10 @@ jax.tree_util.register_pytree_node(
     TransitionBatch,
     lambda tn: (tuple(tn), None),
     lambda treedef, leaves: TransitionBatch(*leaves))
+
+
+def _to_batch(pytree):
+    """ add a batch axis (axis=0) to all leaves """
+    if pytree is None:
+        return None
+    return jax.tree_map(lambda x: onp.expand_dims(x, axis=0), pytree)
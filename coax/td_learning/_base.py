@@ -29,7 +29,7 @@ import optax
 from .._base.mixins import RandomStateMixin
 from .._core.v import V
 from .._core.q import Q
-from ..utils import get_grads_diagnostics, is_policy
+from ..utils import get_grads_diagnostics, has_nans, is_policy
 from ..value_losses import huber
 from ..regularizers import Regularizer
 
@@ -61,7 +61,9 @@ class BaseTDLearning(ABC, RandomStateMixin):
             new_params = optax.apply_updates(params, updates)
             return new_opt_state, new_params
 
-        self._apply_grads_func = jax.jit(apply_grads_func, static_argnums=0)
+        # the internal optimizer state is never handed out (see optimizer_state), so we let jax
+        # recycle its buffers
+        self._apply_grads_func = jax.jit(apply_grads_func, static_argnums=0, donate_argnums=1)
 
     @abstractmethod
     def target_func(self, target_params, target_state, rng, transition_batch):
@@ -77,7 +79,7 @@ class BaseTDLearning(ABC, RandomStateMixin):
     def target_function_state(self):
         pass
 
-    def update(self, transition_batch):
+    def update(self, transition_batch, return_td_error=False):
         r"""
 
         Update the model parameters (weights) of the underlying function approximator.
@@ -88,18 +90,33 @@ class BaseTDLearning(ABC, RandomStateMixin):
 
             A batch of transitions.
 
+        return_td_error : bool, optional
+
+            Whether to also return the TD-errors, computed with the model parameters from *before*
+            the update. This is equivalent to calling :attr:`td_error` right before :attr:`update`,
+            except that most TD learners get the TD-errors for free, as a by-product of computing
+            the gradients.
+
         Returns
         -------
         metrics : dict of scalar ndarrays
 
             The structure of the metrics dict is ``{name: score}``.
 
+        td_error : ndarray, optional
+
+            The non-aggregated TD-errors, :code:`shape == (batch_size,)`. This is only returned if
+            we set :code:`return_td_error=True`.
+
         """
-        grads, function_state, metrics = self.grads_and_metrics(transition_batch)
-        if any(jnp.any(jnp.isnan(g)) for g in jax.tree_leaves(grads)):
+        grads, function_state, metrics, td_error = \
+            self._grads_and_metrics_and_td_error(transition_batch)
+        if return_td_error and td_error is None:
+            td_error = self.td_error(transition_batch)  # not a by-product of the grads computation
+        if has_nans(grads):
             raise RuntimeError(f"found nan's in grads: {grads}")
         self.update_from_grads(grads, function_state)
-        return metrics
+        return (metrics, td_error) if return_td_error else metrics
 
     def update_from_grads(self, grads, function_state):
         r"""
@@ -123,8 +140,8 @@ class BaseTDLearning(ABC, RandomStateMixin):
 
         """
         self._f.function_state = function_state
-        self.optimizer_state, self._f.params = \
-            self._apply_grads_func(self.optimizer, self.optimizer_state, self._f.params, grads)
+        self._optimizer_state, self._f.params = \
+            self._apply_grads_func(self.optimizer, self._optimizer_state, self._f.params, grads)
 
     def grads_and_metrics(self, transition_batch):
         r"""
@@ -153,6 +170,10 @@ class BaseTDLearning(ABC, RandomStateMixin):
             The structure of the metrics dict is ``{name: score}``.
 
         """
+        grads, function_state, metrics, _ = self._grads_and_metrics_and_td_error(transition_batch)
+        return grads, function_state, metrics
+
+    def _grads_and_metrics_and_td_error(self, transition_batch):
         return self._grads_and_metrics_func(
             self._f.params, self.target_params, self._f.function_state, self.target_function_state,
             self._f.rng, transition_batch)
@@ -194,19 +215,25 @@ class BaseTDLearning(ABC, RandomStateMixin):
     @optimizer.setter
     def optimizer(self, new_optimizer):
         new_optimizer_state_structure = jax.tree_structure(new_optimizer.init(self._f.params))
-        if new_optimizer_state_structure != jax.tree_structure(self.optimizer_state):
+        if new_optimizer_state_structure != jax.tree_structure(self._optimizer_state):
             raise AttributeError("cannot set optimizer attr: mismatch in optimizer_state structure")
         self._optimizer = new_optimizer
 
     @property
     def optimizer_state(self):
-        return self._optimizer_state
+        """
+
+        A copy of the optimizer state. The internal buffers are recycled (donated) by each update,
+        which is why we never hand them out directly.
+
+        """
+        return jax.tree_map(jnp.copy, self._optimizer_state)
 
     @optimizer_state.setter
     def optimizer_state(self, new_optimizer_state):
-        if jax.tree_structure(new_optimizer_state) != jax.tree_structure(self.optimizer_state):
+        if jax.tree_structure(new_optimizer_state) != jax.tree_structure(self._optimizer_state):
             raise AttributeError("cannot set optimizer_state attr: mismatch in tree structure")
-        self._optimizer_state = new_optimizer_state
+        self._optimizer_state = jax.tree_map(jnp.copy, new_optimizer_state)
 
 
 class BaseTDLearningV(BaseTDLearning):
@@ -267,7 +294,7 @@ class BaseTDLearningV(BaseTDLearning):
             # add some diagnostics of the gradients
             metrics.update(get_grads_diagnostics(grads, key_prefix=f'{name}/grads_'))
 
-            return grads, state_new, metrics
+            return grads, state_new, metrics, td_error
 
         def td_error_func(params, target_params, state, target_state, rng, transition_batch):
             loss, aux = loss_func(params, target_params, state, target_state, rng, transition_batch)
@@ -361,7 +388,7 @@ class BaseTDLearningQ(BaseTDLearning):
             # add some diagnostics of the gradients
             metrics.update(get_grads_diagnostics(grads, key_prefix=f'{name}/grads_'))
 
-            return grads, state_new, metrics
+            return grads, state_new, metrics, td_error
 
         def td_error_func(params, target_params, state, target_state, rng, transition_batch):
             loss, aux = loss_func(params, target_params, state, target_state, rng, transition_batch)
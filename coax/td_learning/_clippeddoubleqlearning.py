@@ -180,7 +180,8 @@ class ClippedDoubleQLearning(BaseTDLearning):  # TODO(krholshe): make this less
             # add some diagnostics of the gradients
             metrics.update(get_grads_diagnostics(grads, key_prefix=f'{name}/grads_'))
 
-            return grads, state_new, metrics
+            # td_error_func runs in eval mode, so the TD-error isn't a by-product here, see update()
+            return grads, state_new, metrics, None
 
         def td_error_func(params, target_params, state, target_state, rng, transition_batch):
             rngs = hk.PRNGSequence(rng)
@@ -196,7 +197,7 @@ class ClippedDoubleQLearning(BaseTDLearning):  # TODO(krholshe): make this less
             new_params = optax.apply_updates(params, updates)
             return new_opt_state, new_params
 
-        self._apply_grads_func = jax.jit(apply_grads_func, static_argnums=0)
+        self._apply_grads_func = jax.jit(apply_grads_func, static_argnums=0, donate_argnums=1)
         self._grads_and_metrics_func = jax.jit(grads_and_metrics_func)
         self._td_error_func = jax.jit(td_error_func)
 
@@ -61,6 +61,24 @@ class TestClippedDoubleQLearning(TestCase):
         self.assertPytreeNotEqual(function_state1, q1.function_state)
         self.assertPytreeNotEqual(function_state2, q2.function_state)
 
+    def test_update_return_td_error(self):
+        env = self.env_discrete
+        func_q = self.func_q_type1
+        transition_batch = self.transitions_discrete
+
+        q1 = Q(func_q, env)
+        q2 = Q(func_q, env)
+        q_targ1 = q1.copy()
+        q_targ2 = q2.copy()
+        updater = ClippedDoubleQLearning(q1, q_targ_list=[q_targ1, q_targ2], optimizer=sgd(1.0))
+
+        td_error_expected = updater.td_error(transition_batch)
+        metrics, td_error = updater.update(transition_batch, return_td_error=True)
+
+        self.assertIn('ClippedDoubleQLearning/loss', metrics)
+        self.assertArrayShape(td_error, (transition_batch.batch_size,))
+        self.assertPytreeAlmostEqual(td_error, td_error_expected)
+
     def test_update_discrete_type2(self):
         env = self.env_discrete
         func_q = self.func_q_type2
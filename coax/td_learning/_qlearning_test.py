@@ -68,6 +68,20 @@ class TestQLearning(TestCase):
         self.assertPytreeNotEqual(params, q.params)
         self.assertPytreeNotEqual(function_state, q.function_state)
 
+    def test_update_return_td_error(self):
+        transition_batch = self.transitions_discrete
+
+        q = Q(self.func_q_type1, self.env_discrete)
+        q_targ = q.copy()
+        updater = QLearning(q, q_targ=q_targ, optimizer=sgd(1.0))
+
+        td_error_expected = updater.td_error(transition_batch)
+        metrics, td_error = updater.update(transition_batch, return_td_error=True)
+
+        self.assertIn('QLearning/loss', metrics)
+        self.assertArrayShape(td_error, (transition_batch.batch_size,))
+        self.assertPytreeAlmostEqual(td_error, td_error_expected)
+
     def test_update_boxspace(self):
         env = self.env_boxspace
         func_q = self.func_q_type1
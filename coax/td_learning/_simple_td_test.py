@@ -19,9 +19,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.          #
 # ------------------------------------------------------------------------------------------------ #
 
-from copy import deepcopy
-
-from optax import sgd
+from optax import adam, sgd
 
 from .._base.test_case import TestCase
 from .._core.v import V
@@ -34,108 +32,112 @@ from ._simple_td import SimpleTD
 
 class TestSimpleTD(TestCase):
 
+    # function approximators and transitions that are created once and shared between tests
+    shared = {}
+    pristine = {}
+
     def setUp(self):
-        self.transition_discrete = get_transition(self.env_discrete).to_batch()
-        self.transition_boxspace = get_transition(self.env_boxspace).to_batch()
+        if not self.shared:
+            self.shared.update(
+                v_discrete=V(self.func_v, self.env_discrete, random_seed=11),
+                v_boxspace=V(self.func_v, self.env_boxspace, random_seed=11),
+                pi_discrete=Policy(self.func_pi_discrete, self.env_discrete, random_seed=17),
+                pi_boxspace=Policy(self.func_pi_boxspace, self.env_boxspace, random_seed=17),
+                transition_discrete=get_transition(self.env_discrete, random_seed=13).to_batch(),
+                transition_boxspace=get_transition(self.env_boxspace, random_seed=13).to_batch())
+
+            # params and function state are never modified in-place, so references suffice
+            for name in ('v_discrete', 'v_boxspace', 'pi_discrete', 'pi_boxspace'):
+                f = self.shared[name]
+                self.pristine[name] = (f.params, f.function_state, f.random_seed)
+
+        # transitions are only ever read, so these can be shared as-is
+        self.transition_discrete = self.shared['transition_discrete']
+        self.transition_boxspace = self.shared['transition_boxspace']
+
+    def fresh(self, name):
+        """ get a shared function approximator, restored to its freshly initialized state """
+        f = self.shared[name]
+        f.params, f.function_state, f.random_seed = self.pristine[name]
+        return f
 
     def test_update_discrete(self):
-        env = self.env_discrete
-        func_v = self.func_v
+        self.check_update('discrete')
+
+    def test_update_boxspace(self):
+        self.check_update('boxspace')
 
-        v = V(func_v, env, random_seed=11)
-        v_targ = v.copy()
+    def check_update(self, space):
+        v = self.fresh(f'v_{space}')
+        v_targ = v.copy(deep=False)
         updater = SimpleTD(v, v_targ, optimizer=sgd(1.0))
 
-        params = deepcopy(v.params)
-        function_state = deepcopy(v.function_state)
+        params = v.params
+        function_state = v.function_state
 
-        updater.update(self.transition_discrete)
+        updater.update(getattr(self, f'transition_{space}'))
 
         self.assertPytreeNotEqual(params, v.params)
         self.assertPytreeNotEqual(function_state, v.function_state)
 
-    def test_update_boxspace(self):
-        env = self.env_boxspace
-        func_v = self.func_v
+    def test_update_return_td_error(self):
+        transition_batch = self.transitions_discrete
 
-        v = V(func_v, env, random_seed=11)
-        v_targ = v.copy()
+        v = self.fresh('v_discrete')
+        v_targ = v.copy(deep=False)
         updater = SimpleTD(v, v_targ, optimizer=sgd(1.0))
 
-        params = deepcopy(v.params)
-        function_state = deepcopy(v.function_state)
+        td_error_expected = updater.td_error(transition_batch)
+        metrics, td_error = updater.update(transition_batch, return_td_error=True)
 
-        updater.update(self.transition_boxspace)
+        self.assertIn('SimpleTD/loss', metrics)
+        self.assertArrayShape(td_error, (transition_batch.batch_size,))
+        self.assertPytreeAlmostEqual(td_error, td_error_expected)
 
-        self.assertPytreeNotEqual(params, v.params)
-        self.assertPytreeNotEqual(function_state, v.function_state)
+    def test_optimizer_state_survives_update(self):
+        # adam has a non-trivial optimizer state, whose internal buffers are donated by update()
+        v = self.fresh('v_discrete')
+        updater1 = SimpleTD(v, v.copy(deep=False), optimizer=adam(1e-3))
+        updater2 = SimpleTD(v, v.copy(deep=False), optimizer=adam(1e-3))
 
-    def test_policyreg_discrete(self):
-        env = self.env_discrete
-        func_v = self.func_v
-        func_pi = self.func_pi_discrete
-        transition_batch = self.transition_discrete
-
-        v = V(func_v, env, random_seed=11)
-        pi = Policy(func_pi, env, random_seed=17)
-        v_targ = v.copy()
+        opt_state = updater1.optimizer_state
+        updater2.optimizer_state = opt_state
+        updater1.update(self.transition_discrete)
+        updater2.update(self.transition_discrete)
 
-        params_init = deepcopy(v.params)
-        function_state_init = deepcopy(v.function_state)
+        # neither the handed-out state nor the one that was passed in got invalidated
+        self.assertPytreeAlmostEqual(opt_state, updater2.optimizer.init(v.params))
+        self.assertPytreeNotEqual(opt_state, updater1.optimizer_state)
 
-        # first update without policy regularizer
-        policy_reg = EntropyRegularizer(pi, beta=1.0)
-        updater = SimpleTD(v, v_targ, optimizer=sgd(1.0))
-        updater.update(transition_batch)
-        params_without_reg = deepcopy(v.params)
-        function_state_without_reg = deepcopy(v.function_state)
-        self.assertPytreeNotEqual(params_without_reg, params_init)
-        self.assertPytreeNotEqual(function_state_without_reg, function_state_init)
-
-        # reset weights
-        v = V(func_v, env, random_seed=11)
-        pi = Policy(func_pi, env, random_seed=17)
-        v_targ = v.copy()
-        self.assertPytreeAlmostEqual(params_init, v.params)
-        self.assertPytreeAlmostEqual(function_state_init, v.function_state)
-
-        # then update with policy regularizer
-        policy_reg = EntropyRegularizer(pi, beta=1.0)
-        updater = SimpleTD(v, v_targ, optimizer=sgd(1.0), policy_regularizer=policy_reg)
-        updater.update(transition_batch)
-        params_with_reg = deepcopy(v.params)
-        function_state_with_reg = deepcopy(v.function_state)
-        self.assertPytreeNotEqual(params_with_reg, params_init)
-        self.assertPytreeNotEqual(function_state_with_reg, function_state_init)
-        self.assertPytreeNotEqual(params_with_reg, params_without_reg)
-        self.assertPytreeAlmostEqual(function_state_with_reg, function_state_without_reg)  # same!
+    def test_policyreg_discrete(self):
+        self.check_policyreg('discrete')
 
     def test_policyreg_boxspace(self):
-        env = self.env_boxspace
-        func_v = self.func_v
-        func_pi = self.func_pi_boxspace
-        transition_batch = self.transition_boxspace
+        self.check_policyreg('boxspace')
+
+    def check_policyreg(self, space):
+        transition_batch = getattr(self, f'transition_{space}')
 
-        v = V(func_v, env, random_seed=11)
-        pi = Policy(func_pi, env, random_seed=17)
-        v_targ = v.copy()
+        v = self.fresh(f'v_{space}')
+        pi = self.fresh(f'pi_{space}')
+        v_targ = v.copy(deep=False)
 
-        params_init = deepcopy(v.params)
-        function_state_init = deepcopy(v.function_state)
+        params_init = v.params
+        function_state_init = v.function_state
 
         # first update without policy regularizer
         policy_reg = EntropyRegularizer(pi, beta=1.0)
         updater = SimpleTD(v, v_targ, optimizer=sgd(1.0))
         updater.update(transition_batch)
-        params_without_reg = deepcopy(v.params)
-        function_state_without_reg = deepcopy(v.function_state)
+        params_without_reg = v.params
+        function_state_without_reg = v.function_state
         self.assertPytreeNotEqual(params_without_reg, params_init)
         self.assertPytreeNotEqual(function_state_without_reg, function_state_init)
 
         # reset weights
-        v = V(func_v, env, random_seed=11)
-        pi = Policy(func_pi, env, random_seed=17)
-        v_targ = v.copy()
+        v = self.fresh(f'v_{space}')
+        pi = self.fresh(f'pi_{space}')
+        v_targ = v.copy(deep=False)
         self.assertPytreeAlmostEqual(params_init, v.params)
         self.assertPytreeAlmostEqual(function_state_init, v.function_state)
 
@@ -143,8 +145,8 @@ class TestSimpleTD(TestCase):
         policy_reg = EntropyRegularizer(pi, beta=1.0)
         updater = SimpleTD(v, v_targ, optimizer=sgd(1.0), policy_regularizer=policy_reg)
         updater.update(transition_batch)
-        params_with_reg = deepcopy(v.params)
-        function_state_with_reg = deepcopy(v.function_state)
+        params_with_reg = v.params
+        function_state_with_reg = v.function_state
         self.assertPytreeNotEqual(params_with_reg, params_init)
         self.assertPytreeNotEqual(function_state_with_reg, function_state_init)
         self.assertPytreeNotEqual(params_with_reg, params_without_reg)
@@ -155,16 +157,16 @@ class TestSimpleTD(TestCase):
         func_v = self.func_v
         transition_batch = self.transition_discrete
 
-        v = V(func_v, env, random_seed=11)
+        v = self.fresh('v_discrete')
 
-        params_init = deepcopy(v.params)
-        function_state_init = deepcopy(v.function_state)
+        params_init = v.params
+        function_state_init = v.function_state
 
         # first update without value transform
         updater = SimpleTD(v, optimizer=sgd(1.0))
         updater.update(transition_batch)
-        params_without_reg = deepcopy(v.params)
-        function_state_without_reg = deepcopy(v.function_state)
+        params_without_reg = v.params
+        function_state_without_reg = v.function_state
         self.assertPytreeNotEqual(params_without_reg, params_init)
         self.assertPytreeNotEqual(function_state_without_reg, function_state_init)
 
@@ -176,8 +178,8 @@ class TestSimpleTD(TestCase):
         # then update with value transform
         updater = SimpleTD(v, optimizer=sgd(1.0))
         updater.update(transition_batch)
-        params_with_reg = deepcopy(v.params)
-        function_state_with_reg = deepcopy(v.function_state)
+        params_with_reg = v.params
+        function_state_with_reg = v.function_state
         self.assertPytreeNotEqual(params_with_reg, params_init)
         self.assertPytreeNotEqual(function_state_with_reg, function_state_init)
         self.assertPytreeNotEqual(params_with_reg, params_without_reg)
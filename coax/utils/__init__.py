@@ -51,6 +51,7 @@ Object Reference
     coax.utils.get_magnitude_quantiles
     coax.utils.get_transition
     coax.utils.has_env_attr
+    coax.utils.has_nans
     coax.utils.idx
     coax.utils.is_policy
     coax.utils.is_qfunction
@@ -88,6 +89,7 @@ from ._array import (
     diff_transform_matrix,
     double_relu,
     get_magnitude_quantiles,
+    has_nans,
     idx,
     isscalar,
     merge_dicts,
@@ -136,6 +138,7 @@ __all__ = (
     'get_grads_diagnostics',
     'get_magnitude_quantiles',
     'has_env_attr',
+    'has_nans',
     'idx',
     'is_policy',
     'is_qfunction',
@@ -44,6 +44,7 @@ __all__ = (
     'double_relu',
     'get_grads_diagnostics',
     'get_magnitude_quantiles',
+    'has_nans',
     'idx',
     'isscalar',
     'merge_dicts',
@@ -578,6 +579,36 @@ def get_magnitude_quantiles(pytree, key_prefix=''):
     return dict(zip(quantile_names, quantiles))
 
 
+@jax.jit
+def _has_nans(pytree):
+    leaves = jax.tree_leaves(pytree)
+    return jnp.any(jnp.stack([jnp.any(jnp.isnan(leaf)) for leaf in leaves])) if leaves else False
+
+
+def has_nans(pytree):
+    r"""
+
+    Check whether a :doc:`pytree <pytrees>` contains any nan's.
+
+    The check runs as a single JIT-compiled function, which means that it only takes one
+    device-to-host transfer, regardless of the number of leaves.
+
+    Parameters
+    ----------
+    pytree : a pytree with ndarray leaves
+
+        A typical example is a pytree of gradients with respect to the model params.
+
+    Returns
+    -------
+    has_nans : bool
+
+        Whether any of the leaves contains a nan.
+
+    """
+    return bool(_has_nans(pytree))
+
+
 def idx(arr, axis=0):
     r"""
     Given a numpy array, return its corresponding integer index array.
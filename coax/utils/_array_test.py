@@ -26,7 +26,7 @@ import numpy as onp
 from haiku import PRNGSequence
 
 from .._base.test_case import TestCase
-from ._array import argmax, check_preprocessors, default_preprocessor
+from ._array import argmax, check_preprocessors, default_preprocessor, has_nans
 from ..proba_dists import NormalDist
 
 
@@ -107,3 +107,10 @@ class TestArrayUtils(TestCase):
         self.assertArrayShape(default_preprocessor(dct)(next(rngs), dct.sample())['mbn'], (1, 11))
         self.assertArrayShape(default_preprocessor(dct)(next(rngs), dct.sample())['mds'][0], (1, 3))
         self.assertArrayShape(default_preprocessor(dct)(next(rngs), dct.sample())['mds'][1], (1, 5))
+
+    def test_has_nans(self):
+        pytree = {'a': onp.zeros((3, 5)), 'b': [onp.ones(7), onp.arange(4)]}
+        self.assertFalse(has_nans(pytree))
+        self.assertFalse(has_nans({}))
+        pytree['b'][0][2] = onp.nan
+        self.assertTrue(has_nans(pytree))
@@ -54,9 +54,8 @@ for ep in range(100):
         if len(buffer) == buffer.capacity:
             for _ in range(4 * buffer.capacity // 32):  # ~4 passes
                 transition_batch = buffer.sample(batch_size=32)
-                td_error = simple_td.td_error(transition_batch)
+                metrics, td_error = simple_td.update(transition_batch, return_td_error=True)
                 vanillapg.update(transition_batch, Adv=td_error)
-                simple_td.update(transition_batch)
 
             buffer.clear()
 